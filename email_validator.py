@@ -8,7 +8,8 @@ import socket
 from datetime import datetime
 from threading import Lock
 import logging
-from typing import Dict, Set
+from array import array
+from typing import Dict, List, Set
 import requests
 import socks
 from functools import lru_cache
@@ -43,6 +44,51 @@ class EmailValidationResult:
     FREE_EMAIL = 'Free Email Provider'
     CUSTOM_DOMAIN = 'Custom Domain Email'
     SMTP_FAILED = 'SMTP Verification Failed'
+    # Exact labels check_email writes to the Status column
+    CHECK_FAILED_SYNTAX = 'Failed syntax check'
+    CHECK_FAILED_MX = 'Failed MX records check'
+    CHECK_DISPOSABLE = 'Disposable email'
+    CHECK_FAILED_SMTP = 'Failed SMTP check'
+
+
+class ValidationVerdict:
+    """Compact per-email verdict; fixed statuses are shared EmailValidationResult constants"""
+    __slots__ = ('email', 'valid', 'status')
+
+    def __init__(self, email, valid=False, status=None):
+        self.email = email
+        self.valid = valid
+        self.status = status
+
+    @property
+    def details(self) -> List[str]:
+        return [self.status] if self.status is not None else []
+
+    def to_dict(self) -> dict:
+        return {
+            'email': self.email,
+            'valid': self.valid,
+            'details': self.details,
+            'smtp_debug': []
+        }
+
+
+class ValidationResultStore:
+    """Array-backed verdict storage: one small int code per row plus a shared status table"""
+
+    def __init__(self):
+        self.statuses = [EmailValidationResult.VALID]
+        self._codes_by_status = {EmailValidationResult.VALID: 0}
+        self.codes = array('I')
+
+    def append(self, verdict: ValidationVerdict):
+        status = verdict.status if verdict.status is not None else EmailValidationResult.VALID
+        code = self._codes_by_status.get(status)
+        if code is None:
+            code = len(self.statuses)
+            self.statuses.append(status)
+            self._codes_by_status[status] = code
+        self.codes.append(code)
 
 
 class EmailValidator:
@@ -182,41 +228,32 @@ class EmailValidator:
 
     def validate_email(self, email: str) -> dict:
         """Return detailed validation results"""
-        result = {
-            'email': email,
-            'valid': False,
-            'details': [],
-            'smtp_debug': []
-        }
+        return self.check_email(email).to_dict()
 
+    def check_email(self, email: str) -> ValidationVerdict:
+        """Return a compact verdict for a single email"""
         try:
             # Check syntax
             if not self.is_valid_syntax(email):
-                result['details'].append("Failed syntax check")
-                return result
+                return ValidationVerdict(email, status=EmailValidationResult.CHECK_FAILED_SYNTAX)
 
             domain = email.split('@')[1]
 
             # Check MX records
             if not self.has_valid_mx_records(domain):
-                result['details'].append("Failed MX records check")
-                return result
+                return ValidationVerdict(email, status=EmailValidationResult.CHECK_FAILED_MX)
 
             # Check disposable
             if self.is_disposable_email(domain):
-                result['details'].append("Disposable email")
-                return result
+                return ValidationVerdict(email, status=EmailValidationResult.CHECK_DISPOSABLE)
 
             # SMTP check
             if self.smtp_handshake(email):
-                result['valid'] = True
-            else:
-                result['details'].append("Failed SMTP check")
+                return ValidationVerdict(email, valid=True)
+            return ValidationVerdict(email, status=EmailValidationResult.CHECK_FAILED_SMTP)
 
         except Exception as e:
-            result['details'].append(f"Error: {str(e)}")
-
-        return result
+            return ValidationVerdict(email, status=f"Error: {str(e)}")
 
     def is_valid_syntax(self, email: str) -> bool:
         return bool(re.match(self.email_regex, email))
@@ -1,8 +1,11 @@
 import time
 from collections import Counter
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import Response
-from typing import Dict, Any
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from typing import Dict, Any, Optional
+import gzip
+import hashlib
+import numpy as np
 import pandas as pd
 from io import BytesIO
 import sqlite3
@@ -10,8 +13,9 @@ import os
 import tempfile
 import uuid
 from datetime import datetime, timedelta
+from email.utils import formatdate
 from starlette.responses import FileResponse
-from email_validator import EmailValidator
+from email_validator import EmailValidator, ValidationResultStore
 import logging
 from ip_pool import IPPool
 from pathlib import Path
@@ -105,6 +109,142 @@ def cleanup_old_files():
 
 TEMP_DIR = tempfile.mkdtemp()
 
+# Chunk size used when streaming result files
+STREAM_CHUNK_SIZE = 64 * 1024
+
+DOWNLOAD_FORMATS = ('csv', 'gzip', 'parquet')
+
+
+def parse_range_header(range_header: str, file_size: int):
+    """Return (start, end) for a single byte range, or None to serve the whole file"""
+    units, _, spec = range_header.partition('=')
+    if units.strip().lower() != 'bytes' or ',' in spec:
+        # Multi-range and unknown units are not supported; fall back to a full response
+        return None
+
+    start_str, dash, end_str = spec.strip().partition('-')
+    if not dash or not (start_str or end_str):
+        return None
+    if any(part and not (part.isascii() and part.isdigit()) for part in (start_str, end_str)):
+        return None
+
+    if start_str == '':
+        # Suffix range: last N bytes
+        length = int(end_str)
+        if length == 0:
+            raise HTTPException(status_code=416, detail="Requested range not satisfiable",
+                                headers={"Content-Range": f"bytes */{file_size}"})
+        start = max(file_size - length, 0)
+        end = file_size - 1
+    else:
+        start = int(start_str)
+        if end_str:
+            end = int(end_str)
+            if end < start:
+                # Last byte before first byte is invalid syntax; ignore the header
+                return None
+            end = min(end, file_size - 1)
+        else:
+            end = file_size - 1
+
+    if start >= file_size:
+        raise HTTPException(status_code=416, detail="Requested range not satisfiable",
+                            headers={"Content-Range": f"bytes */{file_size}"})
+    return start, end
+
+
+def iter_file_range(path: str, start: int, end: int):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def iter_gunzipped(path: str):
+    with gzip.open(path, 'rb') as f:
+        while True:
+            chunk = f.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def file_validators(stat_result: os.stat_result):
+    """Return (etag, last_modified) for a file, shared by full and partial responses"""
+    etag_base = f"{stat_result.st_mtime}-{stat_result.st_size}"
+    etag = '"' + hashlib.md5(etag_base.encode()).hexdigest() + '"'
+    return etag, formatdate(stat_result.st_mtime, usegmt=True)
+
+
+def ranged_file_response(request: Request, path: str, media_type: str, filename: Optional[str] = None,
+                         headers: Optional[Dict[str, str]] = None):
+    """Serve a file from disk, honouring a single HTTP Range request"""
+    stat_result = os.stat(path)
+    etag, last_modified = file_validators(stat_result)
+
+    headers = dict(headers or {})
+    headers["Accept-Ranges"] = "bytes"
+    headers["ETag"] = etag
+    headers["Last-Modified"] = last_modified
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    byte_range = None
+    if range_header and (if_range is None or if_range.strip() in (etag, last_modified)):
+        byte_range = parse_range_header(range_header, stat_result.st_size)
+
+    if byte_range is None:
+        return FileResponse(path=path, filename=filename, media_type=media_type, headers=headers,
+                            stat_result=stat_result)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{stat_result.st_size}"
+    headers["Content-Length"] = str(end - start + 1)
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return StreamingResponse(iter_file_range(path, start, end), status_code=206,
+                             media_type=media_type, headers=headers)
+
+
+def accepts_gzip(request: Request) -> bool:
+    """True if Accept-Encoding allows gzip; an explicit gzip entry overrides '*'"""
+    qualities = {}
+    for coding in request.headers.get("accept-encoding", "").split(','):
+        name, *params = coding.split(';')
+        name = name.strip().lower()
+        if name not in ('gzip', '*'):
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value.strip())
+                except ValueError:
+                    quality = 0.0
+        qualities[name] = quality
+
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+
+def write_parquet_cache(gz_path: str, parquet_path: str):
+    """Convert a gzip CSV result file to Parquet, publishing it atomically"""
+    fd, tmp_path = tempfile.mkstemp(dir=TEMP_DIR, suffix='.parquet.tmp')
+    os.close(fd)
+    try:
+        df = pd.read_csv(gz_path, dtype={'Email': str, 'Status': 'category'}, keep_default_na=False)
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, parquet_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
 
 @app.post("/validate-emails")
 async def validate_emails(file: UploadFile = File(...)):
@@ -120,31 +260,32 @@ async def validate_emails(file: UploadFile = File(...)):
         if 'Email' not in df.columns:
             raise HTTPException(status_code=400, detail="File must contain an 'Email' column")
 
-        # Process emails
-        results = []
+        # Process emails, keeping only one status code per row
+        results = ValidationResultStore()
         for email in df['Email'].values:
-            result = validator.validate_email(email)
-            results.append(result)
+            results.append(validator.check_email(email))
 
-        # Create results DataFrame
+        # Create results DataFrame; status codes map straight onto a categorical column
+        codes = np.frombuffer(results.codes, dtype=np.uintc)
         results_df = pd.DataFrame({
             'Email': df['Email'],
-            'Status': [r['details'][0] if r['details'] else 'Valid' for r in results]
+            'Status': pd.Categorical.from_codes(codes, categories=results.statuses)
         })
 
-        # Split into valid and invalid
-        valid_emails = results_df[results_df['Status'] == 'Valid']
-        invalid_emails = results_df[results_df['Status'] != 'Valid']
+        # Split into valid and invalid (code 0 is always 'Valid')
+        is_valid = codes == 0
+        valid_emails = results_df[is_valid]
+        invalid_emails = results_df[~is_valid]
 
         # Generate validation ID
         validation_id = str(uuid.uuid4())
 
-        # Save files with validation ID
-        refined_path = os.path.join(TEMP_DIR, f"{validation_id}_refined.csv")
-        discarded_path = os.path.join(TEMP_DIR, f"{validation_id}_discarded.csv")
+        # Save gzip-compressed files with validation ID
+        refined_path = os.path.join(TEMP_DIR, f"{validation_id}_refined.csv.gz")
+        discarded_path = os.path.join(TEMP_DIR, f"{validation_id}_discarded.csv.gz")
 
-        valid_emails.to_csv(refined_path, index=False)
-        invalid_emails.to_csv(discarded_path, index=False)
+        valid_emails.to_csv(refined_path, index=False, compression='gzip')
+        invalid_emails.to_csv(discarded_path, index=False, compression='gzip')
 
         return {
             "validation_id": validation_id,
@@ -161,22 +302,57 @@ async def validate_emails(file: UploadFile = File(...)):
 
 
 @app.get("/download/{validation_id}/{file_type}")
-async def download_file(validation_id: str, file_type: str):
+def download_file(validation_id: str, file_type: str, request: Request, format: Optional[str] = None):
+    """Download results as csv, gzip (csv.gz) or parquet.
+
+    Without an explicit format, CSV is sent gzip-encoded to clients that accept it.
+    Declared as a plain def so the Parquet conversion runs in the threadpool.
+    """
     try:
         if file_type not in ['refined', 'discarded']:
             raise HTTPException(status_code=400, detail="Invalid file type")
+        if format is not None and format not in DOWNLOAD_FORMATS:
+            raise HTTPException(status_code=400, detail="Invalid format")
 
-        file_path = os.path.join(TEMP_DIR, f"{validation_id}_{file_type}.csv")
+        gz_path = os.path.join(TEMP_DIR, f"{validation_id}_{file_type}.csv.gz")
 
-        if not os.path.exists(file_path):
+        if not os.path.exists(gz_path):
             raise HTTPException(status_code=404, detail="File not found")
 
-        return FileResponse(
-            path=file_path,
-            filename=f"{'Refined' if file_type == 'refined' else 'Discarded'} - results.csv",
-            media_type='text/csv'
+        base_name = f"{'Refined' if file_type == 'refined' else 'Discarded'} - results"
+
+        if format == 'gzip':
+            return ranged_file_response(request, gz_path, 'application/gzip', filename=f"{base_name}.csv.gz")
+
+        if format == 'parquet':
+            parquet_path = os.path.join(TEMP_DIR, f"{validation_id}_{file_type}.parquet")
+            if not os.path.exists(parquet_path):
+                try:
+                    write_parquet_cache(gz_path, parquet_path)
+                except ImportError:
+                    raise HTTPException(status_code=501, detail="Parquet output is not available")
+            return ranged_file_response(request, parquet_path, 'application/vnd.apache.parquet',
+                                        filename=f"{base_name}.parquet")
+
+        if accepts_gzip(request):
+            return ranged_file_response(
+                request, gz_path, 'text/csv', filename=f"{base_name}.csv",
+                headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+            )
+
+        # Client can't take gzip: decompress on the fly (no range support here)
+        return StreamingResponse(
+            iter_gunzipped(gz_path),
+            media_type='text/csv',
+            headers={
+                "Content-Disposition": f'attachment; filename="{base_name}.csv"',
+                "Accept-Ranges": "none",
+                "Vary": "Accept-Encoding"
+            }
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
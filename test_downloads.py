@@ -0,0 +1,167 @@
+import gzip
+import os
+from array import array
+from io import BytesIO
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from email_validator import EmailValidationResult, ValidationResultStore, ValidationVerdict
+
+VERDICTS = {
+    'a@x.com': ValidationVerdict('a@x.com', valid=True),
+    'bad': ValidationVerdict('bad', status=EmailValidationResult.CHECK_FAILED_SYNTAX),
+    'c@y.com': ValidationVerdict('c@y.com', status=EmailValidationResult.CHECK_FAILED_SMTP),
+}
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'TEMP_DIR', str(tmp_path))
+    monkeypatch.setattr(main.validator, 'check_email', lambda email: VERDICTS[email])
+    return TestClient(main.app)
+
+
+def upload(client, body=b'Email\na@x.com\nbad\nc@y.com\n'):
+    response = client.post('/validate-emails', files={'file': ('t.csv', body, 'text/csv')})
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.fixture
+def validation_id(client):
+    return upload(client)['validation_id']
+
+
+def gz_bytes(validation_id, file_type='discarded'):
+    with open(f"{main.TEMP_DIR}/{validation_id}_{file_type}.csv.gz", 'rb') as f:
+        return f.read()
+
+
+def test_result_store_shares_codes():
+    store = ValidationResultStore()
+    for email in ['a@x.com', 'bad', 'c@y.com', 'bad', 'a@x.com']:
+        store.append(VERDICTS[email])
+    assert store.statuses == ['Valid', 'Failed syntax check', 'Failed SMTP check']
+    assert store.codes == array('I', [0, 1, 2, 1, 0])
+
+
+def test_validate_splits_results(client):
+    result = upload(client)
+    assert result['stats'] == {'total_emails': 3, 'valid_emails': 1, 'invalid_emails': 2}
+
+
+def test_empty_upload(client):
+    result = upload(client, b'Email\n')
+    assert result['stats'] == {'total_emails': 0, 'valid_emails': 0, 'invalid_emails': 0}
+
+
+def test_range_prefix(client, validation_id):
+    data = gz_bytes(validation_id)
+    response = client.get(f'/download/{validation_id}/discarded?format=gzip', headers={'Range': 'bytes=0-9'})
+    assert response.status_code == 206
+    assert response.headers['content-range'] == f'bytes 0-9/{len(data)}'
+    assert response.content == data[:10]
+
+
+def test_range_suffix(client, validation_id):
+    data = gz_bytes(validation_id)
+    response = client.get(f'/download/{validation_id}/discarded?format=gzip', headers={'Range': 'bytes=-5'})
+    assert response.status_code == 206
+    assert response.headers['content-range'] == f'bytes {len(data) - 5}-{len(data) - 1}/{len(data)}'
+    assert response.content == data[-5:]
+
+
+@pytest.mark.parametrize('range_header', ['bytes=99999-', 'bytes=-0'])
+def test_range_not_satisfiable(client, validation_id, range_header):
+    size = len(gz_bytes(validation_id))
+    response = client.get(f'/download/{validation_id}/discarded?format=gzip', headers={'Range': range_header})
+    assert response.status_code == 416
+    assert response.headers['content-range'] == f'bytes */{size}'
+
+
+@pytest.mark.parametrize('range_header', ['bytes=0-1,4-5', 'bytes=abc', 'lines=0-1', 'bytes=10-5',
+                                          'bytes=5', 'bytes=--5', 'bytes=+5-', 'bytes=1_0-', b'bytes=\xb2-'])
+def test_range_ignored(client, validation_id, range_header):
+    response = client.get(f'/download/{validation_id}/discarded?format=gzip', headers={'Range': range_header})
+    assert response.status_code == 200
+    assert response.content == gz_bytes(validation_id)
+
+
+def test_if_range(client, validation_id):
+    url = f'/download/{validation_id}/discarded?format=gzip'
+    full = client.get(url)
+    etag = full.headers['etag']
+    assert full.headers['last-modified']
+
+    partial = client.get(url, headers={'Range': 'bytes=0-9', 'If-Range': etag})
+    assert partial.status_code == 206
+    assert partial.headers['etag'] == etag
+    assert partial.headers['last-modified'] == full.headers['last-modified']
+
+    stale = client.get(url, headers={'Range': 'bytes=0-9', 'If-Range': '"stale"'})
+    assert stale.status_code == 200
+    assert stale.content == gz_bytes(validation_id)
+
+
+def test_download_gzip_encoded(client, validation_id):
+    response = client.get(f'/download/{validation_id}/discarded', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.text == 'Email,Status\nbad,Failed syntax check\nc@y.com,Failed SMTP check\n'
+
+
+@pytest.mark.parametrize('accept_encoding', ['identity', 'gzip;q=0', 'gzip;Q=0.', '*;q=0', 'gzip;q=0, *'])
+def test_download_identity(client, validation_id, accept_encoding):
+    response = client.get(f'/download/{validation_id}/discarded', headers={'Accept-Encoding': accept_encoding})
+    assert response.status_code == 200
+    assert 'content-encoding' not in response.headers
+    assert response.text == 'Email,Status\nbad,Failed syntax check\nc@y.com,Failed SMTP check\n'
+
+
+@pytest.mark.parametrize('accept_encoding', ['*', '*;q=0, gzip', 'br, gzip;q=0.5'])
+def test_accepts_gzip(client, validation_id, accept_encoding):
+    response = client.get(f'/download/{validation_id}/discarded', headers={'Accept-Encoding': accept_encoding})
+    assert response.headers['content-encoding'] == 'gzip'
+
+
+def test_download_gzip_format(client, validation_id):
+    response = client.get(f'/download/{validation_id}/discarded?format=gzip', headers={'Accept-Encoding': 'identity'})
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/gzip'
+    assert gzip.decompress(response.content).startswith(b'Email,Status\n')
+
+
+def test_download_parquet(client, validation_id):
+    pytest.importorskip('pyarrow')
+    response = client.get(f'/download/{validation_id}/discarded?format=parquet')
+    assert response.status_code == 200
+
+    df = pd.read_parquet(BytesIO(response.content))
+    assert list(df['Email']) == ['bad', 'c@y.com']
+    assert str(df['Status'].dtype) == 'category'
+
+
+def test_download_bad_format(client, validation_id):
+    response = client.get(f'/download/{validation_id}/discarded?format=bogus')
+    assert response.status_code == 400
+
+
+def test_download_missing(client):
+    response = client.get('/download/missing/refined')
+    assert response.status_code == 404
+
+
+def test_parquet_failure_leaves_no_cache(client, validation_id, monkeypatch):
+    def fail(self, path, **kwargs):
+        with open(path, 'wb') as f:
+            f.write(b'partial')
+        raise RuntimeError('disk full')
+
+    monkeypatch.setattr(main.pd.DataFrame, 'to_parquet', fail)
+    response = client.get(f'/download/{validation_id}/discarded?format=parquet')
+    assert response.status_code == 500
+
+    assert not [name for name in os.listdir(main.TEMP_DIR) if 'parquet' in name]